@@ -5,6 +5,13 @@ class StopMonitor {
         this.orderType = orderType;
 		
 		this.pageHidden = false;
+
+		this.socket = null;
+		this.connectPending = false;
+		this.reconnectAttempts = 0;
+
+		this.departureCallback = null;
+		this.situationCallback = null;
 		
 		let t = this;
 		window.addEventListener('focus', function() {
@@ -14,32 +21,64 @@ class StopMonitor {
 		window.addEventListener('blur', function() {
 			t.pageHidden = true;
 		}, false);
+
+		window.addEventListener('beforeunload', function() {
+			if (t.socket != null) {
+				t.socket.onclose = null;
+				t.socket.close();
+			}
+		}, false);
     }
 
 	requestDepartureUpdates(departureTemplate, callback) {
 		// create template
         this.departureTemplate = _.template(departureTemplate);
+		this.departureCallback = callback;
 		
 		// establish WebSocket connection to server
-		try {
-			this._connectDeparturesWebSocket(callback)			
-		} catch (error) {
-			callback(null, 0);
-		}
+		this._requestMonitorWebSocket();
 	} 
 
 	requestSituationUpdates(situationTemplate, callback) {
 		this.situationTemplate = _.template(situationTemplate);
+		this.situationCallback = callback;
 
 		// establish WebSocket connection to server
-		try {
-			this._connectSituationsWebSocket(callback)			
-		} catch (error) {
-			callback(null, 0);
+		this._requestMonitorWebSocket();
+	}
+
+	_requestMonitorWebSocket() {
+		// defer connecting, so all streams requested by the template are known when the socket is opened
+		if (this.socket != null || this.connectPending) {
+			return;
 		}
+
+		this.connectPending = true;
+
+		let t = this;
+		setTimeout(function () {
+			t.connectPending = false;
+
+			try {
+				t._connectMonitorWebSocket()
+			} catch (error) {
+				if (t.departureCallback != null) {
+					t.departureCallback(null, 0);
+				}
+
+				if (t.situationCallback != null) {
+					t.situationCallback(null, 0);
+				}
+			}
+		}, 0);
 	}
 	
-	_connectDeparturesWebSocket(callback) {
+	_connectMonitorWebSocket() {
+		// departures and situations share one connection, so connect only once
+		if (this.socket != null) {
+			return;
+		}
+
 		// obtain WebSocket connection parameters
 		let protocol = 'ws:';
 		let host = window.location.host
@@ -50,89 +89,101 @@ class StopMonitor {
 		let t = this;
 
 		// create WebSocket instance
-		let socket = new WebSocket(`${protocol}//${host}/ws/departures/${this.orderType}/${this.numResults}/${this.stopRef}`);
+		let socket = new WebSocket(`${protocol}//${host}/ws/monitor/${this.stopRef}?numresults=${this.numResults}&ordertype=${this.orderType}&situations=${this.situationCallback != null ? 1 : 0}`);
 		socket.onmessage = function (event) {
+			// reset backoff only once the server actually delivered data
+			t.reconnectAttempts = 0;
+
 			let message = JSON.parse(event.data)
 
-			let departuresHtml = null;
-			if ('departures' in message) {
-				departuresHtml = '';
-
-				_.forEach(message.departures, function (departure, index) {
-					departuresHtml += t.departureTemplate({
-						planned_date: departure.planned_date,
-						planned_time: departure.planned_time,
-						estimated_date: departure.estimated_date,
-						estimated_time: departure.estimated_time,
-						realtime: departure.realtime,
-						cancelled: departure.cancelled,
-						planned_bay: departure.planned_bay,
-						mode: departure.mode,
-						sub_mode: departure.sub_mode,
-						published_mode: departure.published_mode,
-						line_name: departure.line_name,
-						line_description: departure.line_description,
-						origin_text: departure.origin_text,
-						destination_text: departure.destination_text,
-						is_last_element: index == message.departures.length - 1
-					});
-				});
+			if (message.type == 'departures') {
+				t._handleDepartures(message);
+			} else if (message.type == 'situations') {
+				t._handleSituations(message);
 			}
-
-			callback(departuresHtml, message.departures.length);
 		}
 
 		socket.onclose = function(event) {
-			callback(null, 0);
+			t.socket = null;
+
+			if (t.departureCallback != null) {
+				t.departureCallback(null, 0);
+			}
+
+			if (t.situationCallback != null) {
+				t.situationCallback(null, 0);
+			}
+
 			setTimeout(function () {
-				t._connectDeparturesWebSocket(callback)
-			}, 30000);
-		}
+				t._connectMonitorWebSocket()
+			}, t._reconnectDelay());
 
-		window.onbeforeunload = function () {
-			socket.close();
+			t.reconnectAttempts++;
 		}
+
+		this.socket = socket;
 	}
 
-	_connectSituationsWebSocket(callback) {
-		// obtain WebSocket connection parameters
-		let protocol = 'ws:';
-		let host = window.location.host
-		if (window.location.protocol == 'https:') {
-			protocol = 'wss:'
+	_reconnectDelay() {
+		// exponential backoff capped at 60s, with jitter on the upper half to avoid all monitors reconnecting in sync
+		let delay = Math.min(60000, 1000 * Math.pow(2, this.reconnectAttempts));
+		return delay / 2 + Math.random() * delay / 2;
+	}
+
+	_handleDepartures(message) {
+		if (this.departureCallback == null) {
+			return;
 		}
 
 		let t = this;
 
-		// create WebSocket instance
-		let socket = new WebSocket(`${protocol}//${host}/ws/situations/priority/${this.stopRef}`);
-		socket.onmessage = function (event) {
-			let message = JSON.parse(event.data)
-
-			let situationsHtml = null;
-			if ('situations' in message) {
-				situationsHtml = '';
-
-				_.forEach(message.situations, function (situation, index) {
-					situationsHtml += t.situationTemplate({
-						text: situation.text,
-						is_last_element: index == message.situations.length - 1
-					});
+		let departuresHtml = null;
+		if ('departures' in message) {
+			departuresHtml = '';
+
+			_.forEach(message.departures, function (departure, index) {
+				departuresHtml += t.departureTemplate({
+					planned_date: departure.planned_date,
+					planned_time: departure.planned_time,
+					estimated_date: departure.estimated_date,
+					estimated_time: departure.estimated_time,
+					realtime: departure.realtime,
+					cancelled: departure.cancelled,
+					planned_bay: departure.planned_bay,
+					mode: departure.mode,
+					sub_mode: departure.sub_mode,
+					published_mode: departure.published_mode,
+					line_name: departure.line_name,
+					line_description: departure.line_description,
+					origin_text: departure.origin_text,
+					destination_text: departure.destination_text,
+					is_last_element: index == message.departures.length - 1
 				});
-			}
-
-			callback(situationsHtml, message.situations.length);
+			});
 		}
 
-		socket.onclose = function(event) {
-			callback(null, 0);
-			setTimeout(function () {
-				t._connectSituationsWebSocket(callback)
-			}, 30000);
+		this.departureCallback(departuresHtml, departuresHtml != null ? message.departures.length : 0);
+	}
+
+	_handleSituations(message) {
+		if (this.situationCallback == null) {
+			return;
 		}
 
-		window.onbeforeunload = function () {
-			socket.close();
+		let t = this;
+
+		let situationsHtml = null;
+		if ('situations' in message) {
+			situationsHtml = '';
+
+			_.forEach(message.situations, function (situation, index) {
+				situationsHtml += t.situationTemplate({
+					text: situation.text,
+					is_last_element: index == message.situations.length - 1
+				});
+			});
 		}
+
+		this.situationCallback(situationsHtml, situationsHtml != null ? message.situations.length : 0);
 	}
 }
\ No newline at end of file
@@ -1,4 +1,5 @@
 import click
+import json
 import uvicorn
 
 from stopmonitor.server import StopMonitorServer
@@ -26,6 +27,41 @@ def run(config, host, port):
         ]
     )
 
+@cli.command()
+@click.argument('datalog', default='./datalog', type=click.Path(exists=True, file_okay=False))
+@click.option('--iterations', '-n', default=10, help='Number of replays for each recorded response')
+@click.option('--profile', default=None, help='Filename for writing cProfile stats of all stages')
+@click.option('--baseline', default=None, help='Filename for writing the results as JSON baseline')
+@click.option('--compare', default=None, help='Filename of a JSON baseline to compare the results with')
+def bench(datalog, iterations, profile, baseline, compare):
+    from stopmonitor.benchmark import AdapterBenchmark
+    from stopmonitor.benchmark import compare_results
+    from stopmonitor.benchmark import print_profile
+
+    benchmark = AdapterBenchmark(datalog, iterations)
+    results = benchmark.run(profile)
+
+    click.echo(f"{'stage':<30}{'calls':>8}{'failures':>10}{'ops/s':>12}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for stage_name, stage_result in results.items():
+        click.echo(f"{stage_name:<30}{stage_result['calls']:>8}{stage_result['failures']:>10}{stage_result['ops_per_second']:>12.1f}{stage_result['p50_ms']:>10.3f}{stage_result['p90_ms']:>10.3f}{stage_result['p99_ms']:>10.3f}{stage_result['max_ms']:>10.3f}")
+
+    if compare is not None:
+        with open(compare, 'r') as compare_file:
+            comparison = compare_results(json.load(compare_file), results)
+
+        click.echo()
+        click.echo(f"{'stage':<30}{'p50':>10}{'ops/s':>10}")
+        for stage_name, stage_comparison in comparison.items():
+            click.echo(f"{stage_name:<30}{stage_comparison['p50_change']:>+10.1%}{stage_comparison['ops_per_second_change']:>+10.1%}")
+
+    if baseline is not None:
+        with open(baseline, 'w') as baseline_file:
+            json.dump(results, baseline_file, indent=4)
+
+    if profile is not None:
+        click.echo()
+        print_profile(profile)
+
 
 if __name__ == '__main__':
     cli()
\ No newline at end of file
@@ -0,0 +1,158 @@
+import cProfile
+import json
+import logging
+import math
+import os
+import pstats
+import time
+
+from stopmonitor.adapter.text import TextSanitizer
+from stopmonitor.adapter.vdv431.response import LocationInformationResponse
+from stopmonitor.adapter.vdv431.response import StopEventResponse
+
+from lxml.etree import fromstring
+
+class AdapterBenchmark:
+
+    def __init__(self, datalog_directory: str, iterations: int = 10):
+        self._datalog_directory = datalog_directory
+        self._iterations = iterations
+
+        self._stop_event_responses = list()
+        self._location_information_responses = list()
+
+        # load recorded responses from datalog directory
+        for datalog_filename in sorted(os.listdir(self._datalog_directory)):
+            if not datalog_filename.endswith('.xml'):
+                continue
+
+            with open(os.path.join(self._datalog_directory, datalog_filename), 'rb') as datalog_file:
+                xml = datalog_file.read()
+
+            if datalog_filename.endswith('-StopEventResponse.xml'):
+                self._stop_event_responses.append(xml)
+            elif datalog_filename.endswith('-LocationInformationResponse.xml'):
+                self._location_information_responses.append(xml)
+
+        # extract raw situation texts for the sanitizer stage
+        self._situation_texts = list()
+        for xml in self._stop_event_responses:
+            try:
+                root = fromstring(xml)
+            except Exception:
+                continue
+
+            for detail in root.iterfind('.//{http://www.siri.org.uk/siri}Detail'):
+                if detail.text is not None:
+                    self._situation_texts.append(detail.text)
+
+        # create logger instance
+        self._logger = logging.getLogger(__name__)
+
+    def run(self, profile_filename: str|None = None) -> dict:
+        stages = [
+            ('StopEventResponse', self._stop_event_responses, lambda xml: StopEventResponse(xml, 'estimated_time')),
+            ('LocationInformationResponse', self._location_information_responses, lambda xml: LocationInformationResponse(xml)),
+            ('TextSanitizer', self._situation_texts, TextSanitizer().sanitize)
+        ]
+
+        # prepare JSON payloads in the same shape as they're sent to the monitors
+        encoding_payloads = list()
+        for xml in self._stop_event_responses:
+            response = self._parse_safe(StopEventResponse, xml)
+            if response is not None:
+                encoding_payloads.append({'type': 'departures', 'departures': response.departures})
+                encoding_payloads.append({'type': 'situations', 'situations': response.situations})
+
+        for xml in self._location_information_responses:
+            response = self._parse_safe(LocationInformationResponse, xml)
+            if response is not None:
+                encoding_payloads.append({'stops': response.stops})
+
+        stages.append(('JsonEncoding', encoding_payloads, lambda payload: json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')))
+
+        results = dict()
+        for stage_name, samples, stage_function in stages:
+            results[stage_name] = self._measure(samples, stage_function)
+
+        # profile in a separate pass, so the timed results are not inflated by the profiler overhead
+        if profile_filename is not None:
+            profiler = cProfile.Profile()
+            profiler.enable()
+
+            for stage_name, samples, stage_function in stages:
+                for sample in samples:
+                    try:
+                        stage_function(sample)
+                    except Exception:
+                        pass
+
+            profiler.disable()
+            profiler.dump_stats(profile_filename)
+
+        return results
+
+    def _measure(self, samples: list, stage_function) -> dict:
+        durations = list()
+        failures = 0
+
+        for _ in range(self._iterations):
+            for sample in samples:
+                start = time.perf_counter()
+                try:
+                    stage_function(sample)
+                except Exception:
+                    failures = failures + 1
+                    continue
+
+                durations.append(time.perf_counter() - start)
+
+        total = sum(durations)
+
+        return {
+            'samples': len(samples),
+            'calls': len(durations),
+            'failures': failures,
+            'ops_per_second': len(durations) / total if total > 0 else 0.0,
+            'mean_ms': total / len(durations) * 1000 if len(durations) > 0 else 0.0,
+            'p50_ms': self._percentile(durations, 50) * 1000,
+            'p90_ms': self._percentile(durations, 90) * 1000,
+            'p99_ms': self._percentile(durations, 99) * 1000,
+            'max_ms': max(durations) * 1000 if len(durations) > 0 else 0.0
+        }
+
+    def _parse_safe(self, response_class, xml):
+        try:
+            return response_class(xml)
+        except Exception as ex:
+            self._logger.warning(f"Skipping unparseable {response_class.__name__}: {str(ex)}")
+            return None
+
+    def _percentile(self, values: list, percentile: int) -> float:
+        if len(values) == 0:
+            return 0.0
+
+        # nearest-rank percentile, good enough for latency reporting
+        ordered = sorted(values)
+        index = max(0, math.ceil(percentile / 100 * len(ordered)) - 1)
+
+        return ordered[index]
+
+
+def print_profile(profile_filename: str, limit: int = 20) -> None:
+    stats = pstats.Stats(profile_filename)
+    stats.sort_stats('cumulative').print_stats(limit)
+
+
+def compare_results(baseline: dict, results: dict) -> dict:
+    comparison = dict()
+    for stage_name, stage_result in results.items():
+        if stage_name not in baseline or baseline[stage_name]['p50_ms'] == 0:
+            continue
+
+        comparison[stage_name] = {
+            'p50_change': stage_result['p50_ms'] / baseline[stage_name]['p50_ms'] - 1.0,
+            'ops_per_second_change': stage_result['ops_per_second'] / baseline[stage_name]['ops_per_second'] - 1.0 if baseline[stage_name]['ops_per_second'] > 0 else 0.0
+        }
+
+    return comparison
@@ -1,14 +1,25 @@
 import asyncio
+import cProfile
+import io
 import json
 import logging
 import os
+import pstats
+import secrets
+import time
+import tracemalloc
 import yaml
 
+from collections import deque
+
 from fastapi import APIRouter
+from fastapi import Depends
 from fastapi import FastAPI
+from fastapi import HTTPException
 from fastapi import Request
 from fastapi import Response
 from fastapi import WebSocket, WebSocketDisconnect
+from fastapi.security import HTTPBasic, HTTPBasicCredentials
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
@@ -63,7 +74,12 @@ class StopMonitorServer:
 
         # enable admin page if configured
         if self._config['app']['admin_enabled'] == True:
-            self._api_router.add_api_route('/admin', endpoint=self._admin, methods=['GET'])
+            self._api_router.add_api_route('/admin', endpoint=self._admin, methods=['GET'], dependencies=[Depends(self._admin_auth)])
+            self._api_router.add_api_route('/admin/tracemalloc', endpoint=self._admin_tracemalloc, methods=['POST'], dependencies=[Depends(self._admin_auth)])
+            self._api_router.add_api_route('/admin/profile', endpoint=self._admin_profile, methods=['POST'], dependencies=[Depends(self._admin_auth)])
+
+            if self._config['admin']['tracemalloc_enabled'] == True:
+                tracemalloc.start(int(self._config['admin']['tracemalloc_frames']))
 
         # enable required routes
         self._api_router.add_api_route('/view', endpoint=self._view, methods=['GET'], name='view-baseurl')
@@ -71,8 +87,7 @@ class StopMonitorServer:
         
         self._api_router.add_api_route('/json/stops.json', endpoint=self._json_stoprequest, methods=['GET'])
 
-        self._api_router.add_api_websocket_route('/ws/departures/{ordertype}/{numresults}/{stopref}', endpoint=self._departures_websocket)
-        self._api_router.add_api_websocket_route('/ws/situations/{ordertype}/{stopref}', endpoint=self._situations_websocket)
+        self._api_router.add_api_websocket_route('/ws/monitor/{stopref}', endpoint=self._monitor_websocket)
 
         self._template_engine = Jinja2Templates(directory='templates')
         self._landing_engine = Jinja2Templates(directory='landing')
@@ -98,6 +113,12 @@ class StopMonitorServer:
         # create logger instance
         self._logger = logging.getLogger('uvicorn')
 
+        # diagnostics state for the admin page
+        self._subscriptions = dict()
+        self._upstream_latency = dict()
+        self._tracemalloc_snapshot = None
+        self._profiling = False
+
     async def _index(self, request: Request) -> Response:
         template = 'landing.html'
 
@@ -122,8 +143,107 @@ class StopMonitorServer:
 
         return self._landing_engine.TemplateResponse(request=request, name=template, context=ctx)
     
+    async def _admin_auth(self, credentials: HTTPBasicCredentials = Depends(HTTPBasic())) -> None:
+        # deny access at all as long as no password is configured
+        if self._config['admin']['password'] is None:
+            raise HTTPException(status_code=403)
+
+        username_match = secrets.compare_digest(credentials.username.encode('utf-8'), str(self._config['admin']['username']).encode('utf-8'))
+        password_match = secrets.compare_digest(credentials.password.encode('utf-8'), str(self._config['admin']['password']).encode('utf-8'))
+
+        if not username_match or not password_match:
+            raise HTTPException(status_code=401, headers={'WWW-Authenticate': 'Basic'})
+
     async def _admin(self, request: Request) -> Response:
-        return 'admin enabled'
+        now = time.time()
+
+        result = dict()
+
+        # active subscriptions grouped by stop
+        result['subscriptions'] = dict()
+        for subscription in self._subscriptions.values():
+            stop_subscriptions = result['subscriptions'].setdefault(subscription['stop_ref'], list())
+            stop_subscriptions.append({
+                'connected_seconds': round(now - subscription['connected'], 1),
+                'last_poll_age_seconds': round(now - subscription['last_poll'], 1) if subscription['last_poll'] is not None else None
+            })
+
+        # upstream latency of the last requests for each adapter call
+        result['upstream_latency'] = dict()
+        for upstream_name, latencies in self._upstream_latency.items():
+            result['upstream_latency'][upstream_name] = {
+                'requests': len(latencies),
+                'last_ms': round(latencies[-1] * 1000, 1),
+                'mean_ms': round(sum(latencies) / len(latencies) * 1000, 1),
+                'max_ms': round(max(latencies) * 1000, 1)
+            }
+
+        # asyncio tasks grouped by their coroutine
+        tasks = dict()
+        for task in asyncio.all_tasks():
+            coro = task.get_coro()
+            coro_name = getattr(coro, '__qualname__', repr(coro))
+
+            location = None
+            stack = task.get_stack(limit=1)
+            if len(stack) > 0:
+                location = f"{stack[-1].f_code.co_filename}:{stack[-1].f_lineno}"
+
+            task_group = tasks.setdefault(coro_name, {'coro': coro_name, 'count': 0, 'locations': list()})
+            task_group['count'] = task_group['count'] + 1
+            if location is not None and location not in task_group['locations']:
+                task_group['locations'].append(location)
+
+        result['tasks'] = sorted(tasks.values(), key=lambda t: t['count'], reverse=True)[:20]
+
+        # memory allocations compared to the reference snapshot, taken off the event loop
+        result['tracemalloc'] = await asyncio.to_thread(self._tracemalloc_diff)
+
+        return Response(content=json.dumps(result), media_type='application/json')
+    
+    async def _admin_tracemalloc(self, request: Request) -> Response:
+        action = request.query_params['action'] if 'action' in request.query_params else None
+
+        if action == 'start':
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(int(self._config['admin']['tracemalloc_frames']))
+        elif action == 'stop':
+            tracemalloc.stop()
+            self._tracemalloc_snapshot = None
+        elif action == 'snapshot':
+            if not tracemalloc.is_tracing():
+                return Response(status_code=409)
+
+            self._tracemalloc_snapshot = await asyncio.to_thread(self._tracemalloc_snapshot_filtered)
+        else:
+            return Response(status_code=400)
+
+        self._logger.info(f"tracemalloc {action} requested via admin page")
+        return Response(content=json.dumps({'tracing': tracemalloc.is_tracing()}), media_type='application/json')
+    
+    async def _admin_profile(self, request: Request) -> Response:
+        seconds = int(request.query_params['s']) if 's' in request.query_params and request.query_params['s'].isdigit() else 5
+        seconds = max(1, min(seconds, 60))
+
+        # only one profiler can be active at the same time
+        if self._profiling:
+            return Response(content='profile already running', status_code=409)
+
+        self._profiling = True
+
+        # profile everything running on the event loop while this request is waiting
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+            await asyncio.sleep(seconds)
+        finally:
+            profiler.disable()
+            self._profiling = False
+
+        stream = io.StringIO()
+        pstats.Stats(profiler, stream=stream).sort_stats('cumulative').print_stats(50)
+
+        return Response(content=stream.getvalue(), media_type='text/plain')
 
     async def _view(self, template: str, request: Request) -> Response:
         template = f"{template}/{template}.html"
@@ -159,7 +279,7 @@ class StopMonitorServer:
         # run requests
         try:
             # load stops from adapter
-            result = await self._departures_adapter.find_stops(lookup_name)
+            result = await self._timed_upstream('stops', self._departures_adapter.find_stops(lookup_name))
 
             # create JSON result
             json_result = json.dumps(result)
@@ -170,7 +290,7 @@ class StopMonitorServer:
             self._logger.error(str(ex))
             return Response(content=str(ex), status_code=500)
         
-    async def _departures_websocket(self, ordertype: str, numresults: int, stopref: str, ws: WebSocket):
+    async def _monitor_websocket(self, stopref: str, ws: WebSocket, numresults: int = 10, ordertype: str = 'estimated_time', situations: int = 1):
         # handle value constraints
         if not ordertype == 'planned_time' and not ordertype == 'estimated_time':
             ordertype = 'estimated_time'
@@ -184,52 +304,128 @@ class StopMonitorServer:
         # accept WebSocket connection
         await ws.accept()
 
-        try:
-            while True:
-                # load departures from adapter
-                result = await self._departures_adapter.find_departures(
-                    stopref.strip(),
-                    numresults,
-                    ordertype
-                )
+        loop = asyncio.get_running_loop()
 
-                # send results to monitor
-                await ws.send_json(result)
+        next_departures_update = 0
+        next_situations_update = 0 if situations == 1 else float('inf')
 
-                # wait for the next update interval
-                await asyncio.sleep(30)
-        except WebSocketDisconnect:
-            pass
+        last_departures_success = None
 
-    async def _situations_websocket(self, ordertype: str, stopref: str, ws: WebSocket):
-        # handle value constraints
-        if not ordertype == 'priority' and not ordertype == 'priority':
-            ordertype = 'priority'
-        
-        if stopref.strip() == '':
-            return Response(status_code=400)
+        # register subscription for the admin page
+        subscription = {'stop_ref': stopref.strip(), 'connected': time.time(), 'last_poll': None}
+        self._subscriptions[id(ws)] = subscription
 
-        # accept WebSocket connection
-        await ws.accept()
+        # the monitor never sends anything, so reading only serves to notice a closed connection immediately
+        receiver = asyncio.create_task(self._receive_disconnect(ws))
 
         try:
             while True:
-                # load departures from adapter
-                if self._situations_adapter is not None:
-                    result = await self._situations_adapter.find_situations(
-                        stopref.strip(),
-                        ordertype
-                    )
-                else:
-                    result = []
-
-                # send results to monitor
-                await ws.send_json(result)
-
-                # wait for the next update interval
-                await asyncio.sleep(60)
+                # load departures from adapter if the update interval has passed
+                if loop.time() >= next_departures_update:
+                    try:
+                        result = await self._timed_upstream('departures', self._departures_adapter.find_departures(
+                            stopref.strip(),
+                            numresults,
+                            ordertype
+                        ))
+
+                        subscription['last_poll'] = time.time()
+                        last_departures_success = loop.time()
+                    except Exception as ex:
+                        self._logger.error(f"Failed to load departures for {stopref.strip()}: {str(ex)}")
+                        result = None
+
+                        # clear departures on the monitor once the displayed ones are older than two update intervals
+                        if last_departures_success is None or loop.time() - last_departures_success > 60:
+                            result = {'departures': []}
+
+                    # send typed results to monitor, keep the current departures displayed on short errors
+                    if result is not None:
+                        await ws.send_json({'type': 'departures', **result})
+
+                    next_departures_update = loop.time() + 30
+
+                # load situations from adapter if the update interval has passed
+                if loop.time() >= next_situations_update:
+                    if self._situations_adapter is not None:
+                        try:
+                            result = await self._timed_upstream('situations', self._situations_adapter.find_situations(
+                                stopref.strip(),
+                                'priority'
+                            ))
+                        except Exception as ex:
+                            self._logger.error(f"Failed to load situations for {stopref.strip()}: {str(ex)}")
+                            result = None
+                    else:
+                        result = {'situations': []}
+
+                    # send typed results to monitor, keep the current situations displayed on errors
+                    if result is not None:
+                        await ws.send_json({'type': 'situations', **result})
+
+                    next_situations_update = loop.time() + 60
+
+                # wait for the next update interval or until the monitor disconnects
+                await asyncio.wait([receiver], timeout=max(0, min(next_departures_update, next_situations_update) - loop.time()))
+                if receiver.done():
+                    break
         except WebSocketDisconnect:
             pass
+        finally:
+            receiver.cancel()
+            del self._subscriptions[id(ws)]
+
+    async def _receive_disconnect(self, ws: WebSocket) -> None:
+        try:
+            while True:
+                message = await ws.receive()
+                if message['type'] == 'websocket.disconnect':
+                    break
+        except Exception:
+            pass
+
+    async def _timed_upstream(self, upstream_name: str, request):
+        start = time.perf_counter()
+        try:
+            return await request
+        finally:
+            latencies = self._upstream_latency.setdefault(upstream_name, deque(maxlen=100))
+            latencies.append(time.perf_counter() - start)
+
+    def _tracemalloc_diff(self) -> dict:
+        if not tracemalloc.is_tracing():
+            return {'tracing': False}
+
+        current, peak = tracemalloc.get_traced_memory()
+
+        # compare against the reference snapshot, which is only set explicitly via /admin/tracemalloc
+        reference = self._tracemalloc_snapshot
+
+        differences = list()
+        if reference is not None:
+            snapshot = self._tracemalloc_snapshot_filtered()
+            for stat in snapshot.compare_to(reference, 'lineno')[:25]:
+                differences.append({
+                    'location': f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                    'size_kb': round(stat.size / 1024, 1),
+                    'size_diff_kb': round(stat.size_diff / 1024, 1),
+                    'count_diff': stat.count_diff
+                })
+
+        return {
+            'tracing': True,
+            'reference': reference is not None,
+            'current_kb': round(current / 1024, 1),
+            'peak_kb': round(peak / 1024, 1),
+            'differences': differences
+        }
+
+    def _tracemalloc_snapshot_filtered(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>')
+        ])
 
     def _default_config(self, config):
         default_config = {
@@ -257,7 +453,10 @@ class StopMonitorServer:
                 'template_enabled': False
             },
             'admin': {
-                'something': 'ComesHereSoon'
+                'username': 'admin',
+                'password': None,
+                'tracemalloc_enabled': False,
+                'tracemalloc_frames': 1
             },
             'caching': {
                 'caching_server_endpoint': '[YourCachingServerEndpoint]',